@@ -4,48 +4,64 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import json
 import os
-import re
 import shlex
 import shutil
 import subprocess
 import sys
+import threading
 import time
 import uuid
-import tempfile
-from datetime import datetime, timedelta, time as dt_time
+from datetime import date, datetime, timedelta, time as dt_time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
+from urllib.parse import urlsplit
 
-try:
+if TYPE_CHECKING:  # pragma: no cover - typing only
     import spotipy
-    from spotipy.oauth2 import SpotifyOAuth
-except ImportError as exc:  # pragma: no cover - dependency guidance
-    print(
-        "The spotipy package is required. Install it with `pip install spotipy`.",
-        file=sys.stderr,
-    )
-    raise
 
-try:
-    from dotenv import load_dotenv
-except ImportError:
-    load_dotenv = None
+_SPOTIPY_ENV_VARS = ("SPOTIPY_CLIENT_ID", "SPOTIPY_CLIENT_SECRET", "SPOTIPY_REDIRECT_URI")
+
+# Only the scheduled `--now` run may skip .env, and only when the at job already exported
+# the credentials: importers such as web_app read further settings (FLASK_SECRET_KEY, ...)
+# from it, and load_dotenv never overrides variables that are already set.
+_IS_SCHEDULED_RUN = __name__ == "__main__" and "--now" in sys.argv[1:]
+if not (_IS_SCHEDULED_RUN and all(os.environ.get(name) for name in _SPOTIPY_ENV_VARS)):
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        load_dotenv = None
 
-if load_dotenv:
-    load_dotenv()
+    if load_dotenv:
+        load_dotenv()
 
-SCRIPT_DIR = Path(__file__).resolve().parent
+SCRIPT_PATH = Path(__file__).resolve()
+SCRIPT_DIR = SCRIPT_PATH.parent
+PYTHON_EXECUTABLE = Path(sys.executable).resolve()
 os.chdir(SCRIPT_DIR)
 
-_SPOTIFY_URI_PATTERN = re.compile(
-    r"spotify:(?P<type>track|album|playlist|artist):(?P<id>[A-Za-z0-9]{22})"
-)
-_SPOTIFY_URL_PATTERN = re.compile(
-    r"open\.spotify\.com/(?P<type>track|album|playlist|artist)/(?P<id>[A-Za-z0-9]{22})"
-)
+_MEDIA_TYPES = frozenset({"track", "album", "playlist", "artist"})
+
+SPOTIFY_PLAYER_API = "https://api.spotify.com/v1/me/player"
+ACCESS_TOKEN_LIFETIME_SECONDS = 3600
+TOKEN_REFRESH_MARGIN_SECONDS = 120
+# Longest single sleep in wait_until before the wall clock is checked again; no more
+# frequent than the minute-by-minute polling this replaced.
+WAIT_RECHECK_SECONDS = 60.0
+
+
+@functools.cache
+def find_executable(name: str) -> Optional[str]:
+    """Resolve a tool such as at, atq or curl on $PATH once per process.
 
+    Shared with the web app, which runs these tools on every request.
+    """
+    return shutil.which(name)
 
+
+@functools.cache
 def find_venv_activation_script() -> Optional[Path]:
     """Locate a virtualenv activation script to source before scheduled runs."""
     candidates = []
@@ -59,26 +75,37 @@ def find_venv_activation_script() -> Optional[Path]:
             return candidate
     return None
 
+def _is_spotify_id(value: str) -> bool:
+    return len(value) == 22 and value.isascii() and value.isalnum()
+
+
+@functools.lru_cache(maxsize=512)
 def parse_media_reference(raw: str) -> Tuple[str, str]:
     """Normalise track/album/playlist/artist identifiers to a Spotify URI."""
     text = raw.strip()
     if not text:
         raise ValueError("Media reference must not be empty.")
 
-    match = _SPOTIFY_URI_PATTERN.fullmatch(text)
-    if match:
-        media_type = match.group("type")
-        media_id = match.group("id")
-        return media_type, f"spotify:{media_type}:{media_id}"
-
-    if text.startswith("http://") or text.startswith("https://"):
-        url_match = _SPOTIFY_URL_PATTERN.search(text)
-        if url_match:
-            media_type = url_match.group("type")
-            media_id = url_match.group("id")
-            return media_type, f"spotify:{media_type}:{media_id}"
-
-    if len(text) == 22 and text.isalnum():
+    if text.startswith("spotify:"):
+        separator = text.find(":", 8)
+        if separator != -1:
+            media_type = text[8:separator]
+            if media_type in _MEDIA_TYPES and _is_spotify_id(text[separator + 1 :]):
+                return media_type, text
+
+    if text.startswith(("http://", "https://")):
+        url = urlsplit(text)
+        if url.hostname == "open.spotify.com":
+            segments = url.path.strip("/").split("/")
+            # Localised share links carry a leading /intl-<lang>/ segment.
+            if segments[0].startswith("intl-"):
+                segments = segments[1:]
+            if len(segments) >= 2:
+                media_type, media_id = segments[0], segments[1]
+                if media_type in _MEDIA_TYPES and _is_spotify_id(media_id):
+                    return media_type, f"spotify:{media_type}:{media_id}"
+
+    if _is_spotify_id(text):
         # Treat bare IDs as tracks by default.
         return "track", f"spotify:track:{text}"
 
@@ -87,7 +114,58 @@ def parse_media_reference(raw: str) -> Tuple[str, str]:
     )
 
 
+def _two_digits(text: str, offset: int) -> int:
+    """Decode two ASCII digits starting at ``offset``; returns -1 if either is not a digit."""
+    tens = ord(text[offset]) - 48
+    ones = ord(text[offset + 1]) - 48
+    if not (0 <= tens <= 9 and 0 <= ones <= 9):
+        return -1
+    return tens * 10 + ones
+
+
+def _parse_iso_date(text: str) -> Optional[date]:
+    """Parse the canonical ``YYYY-MM-DD`` layout directly; None for any other shape."""
+    if len(text) != 10 or text[4] != "-" or text[7] != "-":
+        return None
+    century = _two_digits(text, 0)
+    year = _two_digits(text, 2)
+    month = _two_digits(text, 5)
+    day = _two_digits(text, 8)
+    if century < 0 or year < 0 or month < 0 or day < 0:
+        return None
+    return date(century * 100 + year, month, day)
+
+
+def _parse_iso_datetime(text: str) -> Optional[datetime]:
+    """Parse ``YYYY-MM-DDTHH:MM[:SS]`` (``T`` or space separated) directly; None otherwise."""
+    length = len(text)
+    if (length != 16 and length != 19) or text[10] not in "T " or text[13] != ":":
+        return None
+    if length == 19 and text[16] != ":":
+        return None
+    target_date = _parse_iso_date(text[:10])
+    if target_date is None:
+        return None
+    hours = _two_digits(text, 11)
+    minutes = _two_digits(text, 14)
+    seconds = _two_digits(text, 17) if length == 19 else 0
+    if hours < 0 or minutes < 0 or seconds < 0:
+        return None
+    return datetime(target_date.year, target_date.month, target_date.day, hours, minutes, seconds)
+
+
+@functools.lru_cache(maxsize=512)
 def parse_clock(time_str: str) -> dt_time:
+    length = len(time_str)
+    if (length == 5 or length == 8) and time_str[2] == ":" and (length == 5 or time_str[5] == ":"):
+        hours = _two_digits(time_str, 0)
+        minutes = _two_digits(time_str, 3)
+        seconds = _two_digits(time_str, 6) if length == 8 else 0
+        if hours >= 0 and minutes >= 0 and seconds >= 0:
+            if not (hours < 24 and minutes < 60 and seconds < 60):
+                raise ValueError("Clock values are out of range.")
+            return dt_time(hours, minutes, seconds)
+
     parts = time_str.split(":")
     if len(parts) not in (2, 3):
         raise ValueError("Use HH:MM or HH:MM:SS for --time.")
@@ -111,7 +189,7 @@ def determine_target_datetime(
     now = datetime.now()
     if at:
         try:
-            target = datetime.fromisoformat(at)
+            target = _parse_iso_datetime(at) or datetime.fromisoformat(at)
         except ValueError as exc:
             raise ValueError(
                 "Unable to parse --at. Use ISO format, e.g. 2025-10-03T08:30 or 2025-10-03 08:30."
@@ -126,12 +204,19 @@ def determine_target_datetime(
     target_time = parse_clock(time_only)
     if date_only:
         try:
-            target_date = datetime.fromisoformat(date_only).date()
+            target_date = _parse_iso_date(date_only) or date.fromisoformat(date_only)
         except ValueError as exc:
             raise ValueError("Unable to parse --date. Use YYYY-MM-DD.") from exc
     else:
-        target_date = now.date()
-    candidate = datetime.combine(target_date, target_time)
+        target_date = now
+    candidate = datetime(
+        target_date.year,
+        target_date.month,
+        target_date.day,
+        target_time.hour,
+        target_time.minute,
+        target_time.second,
+    )
     if candidate <= now:
         if date_only:
             raise ValueError("The chosen date/time is in the past.")
@@ -140,13 +225,35 @@ def determine_target_datetime(
 
 
 def wait_until(target: datetime) -> None:
-    while True:
-        now = datetime.now()
-        remaining = (target - now).total_seconds()
-        if remaining <= 0:
-            return
-        sleep_for = min(remaining, 60)
-        time.sleep(max(sleep_for, 0.5))
+    # Sleep in bounded slices and re-read the wall clock after each one: the monotonic
+    # clock behind Event.wait stops while the machine is suspended, so a single long
+    # wait would start playback late by however long the machine slept.
+    wakeup = threading.Event()
+    remaining = (target - datetime.now()).total_seconds()
+    while remaining > 0:
+        wakeup.wait(min(remaining, WAIT_RECHECK_SECONDS))
+        remaining = (target - datetime.now()).total_seconds()
+
+
+def _index_devices(
+    devices: list[dict],
+) -> Tuple[dict[str, str], Optional[str], Optional[str], list[str]]:
+    """Index devices in one pass: lowercased name to id, active id, first id, display names."""
+    by_name: dict[str, str] = {}
+    active_id: Optional[str] = None
+    first_id: Optional[str] = None
+    names: list[str] = []
+    for position, device in enumerate(devices):
+        name = device.get("name")
+        device_id = device.get("id")
+        if position == 0:
+            first_id = device_id
+        if active_id is None and device.get("is_active"):
+            active_id = device_id
+        if name:
+            by_name.setdefault(name.lower(), device_id)
+        names.append(name if name is not None else "<unnamed>")
+    return by_name, active_id, first_id, names
 
 
 def select_device(sp: spotipy.Spotify, preferred_name: Optional[str]) -> str:
@@ -155,19 +262,15 @@ def select_device(sp: spotipy.Spotify, preferred_name: Optional[str]) -> str:
         raise RuntimeError(
             "No available Spotify devices. Open Spotify on your target device and try again."
         )
+    by_name, active_id, first_id, names = _index_devices(devices)
     if preferred_name:
-        lower = preferred_name.lower()
-        for device in devices:
-            if device.get("name", "").lower() == lower:
-                return device["id"]
-        device_names = ", ".join(device.get("name", "<unnamed>") for device in devices)
+        device_id = by_name.get(preferred_name.lower())
+        if device_id:
+            return device_id
         raise RuntimeError(
-            f"Device named '{preferred_name}' not found. Available devices: {device_names}."
+            f"Device named '{preferred_name}' not found. Available devices: {', '.join(names)}."
         )
-    for device in devices:
-        if device.get("is_active"):
-            return device["id"]
-    return devices[0]["id"]
+    return active_id or first_id
 
 
 def start_playback(
@@ -178,7 +281,25 @@ def start_playback(
     *,
     volume: Optional[int] = None,
 ) -> None:
-    sp.transfer_playback(device_id=device_id, force_play=False)
+    spotipy = _import_spotipy()
+    try:
+        _play_on_device(sp, device_id, media_type, media_uri, volume=volume)
+    except spotipy.SpotifyException as exc:
+        if exc.http_status != 404:
+            raise
+        # The device is not active yet; transfer playback to it and try once more.
+        sp.transfer_playback(device_id=device_id, force_play=False)
+        _play_on_device(sp, device_id, media_type, media_uri, volume=volume)
+
+
+def _play_on_device(
+    sp: spotipy.Spotify,
+    device_id: str,
+    media_type: str,
+    media_uri: str,
+    *,
+    volume: Optional[int],
+) -> None:
     if volume is not None:
         sp.volume(volume, device_id=device_id)
     if media_type == "track":
@@ -187,9 +308,24 @@ def start_playback(
         sp.start_playback(device_id=device_id, context_uri=media_uri)
 
 
+def _import_spotipy():
+    """Import spotipy on first use so --help and validation paths skip its start-up cost."""
+    try:
+        import spotipy
+        import spotipy.oauth2
+    except ImportError:  # pragma: no cover - dependency guidance
+        print(
+            "The spotipy package is required. Install it with `pip install spotipy`.",
+            file=sys.stderr,
+        )
+        raise
+    return spotipy
+
+
 def build_spotify_client(*, open_browser: bool) -> spotipy.Spotify:
+    spotipy = _import_spotipy()
     scope = "user-modify-playback-state user-read-playback-state"
-    auth_manager = SpotifyOAuth(scope=scope, open_browser=open_browser)
+    auth_manager = spotipy.oauth2.SpotifyOAuth(scope=scope, open_browser=open_browser)
     return spotipy.Spotify(auth_manager=auth_manager)
 
 
@@ -200,24 +336,22 @@ def print_devices(sp: spotipy.Spotify) -> None:
         return
     print("Available Spotify devices:")
     for device in devices:
-        status_bits = []
-        if device.get("is_active"):
-            status_bits.append("active")
-        if device.get("is_private_session"):
-            status_bits.append("private")
-        status = f" ({', '.join(status_bits)})" if status_bits else ""
-        name = device.get("name", "<unnamed>")
-        device_type = device.get("type", "unknown")
-        device_id = device.get("id", "<no-id>")
+        name = device.get("name") or "<unnamed>"
+        device_type = device.get("type") or "unknown"
+        device_id = device.get("id") or "<no-id>"
+        active = device.get("is_active")
+        private = device.get("is_private_session")
+        if active:
+            status = " (active, private)" if private else " (active)"
+        else:
+            status = " (private)" if private else ""
         print(f"- {name:<20} [{device_type}] id={device_id}{status}")
 
 
 def build_system_command(args: argparse.Namespace, target: datetime) -> list[str]:
-    script_path = Path(__file__).resolve()
-    python_executable = Path(sys.executable).resolve()
     command = [
-        str(python_executable),
-        str(script_path),
+        str(PYTHON_EXECUTABLE),
+        str(SCRIPT_PATH),
         args.media,
         "--now",
     ]
@@ -229,7 +363,82 @@ def build_system_command(args: argparse.Namespace, target: datetime) -> list[str
     return command
 
 
-def schedule_system_job(target: datetime, args: argparse.Namespace) -> str:
+def prime_token_cache(
+    target: datetime, spotify_client: Optional["spotipy.Spotify"] = None
+) -> Optional[str]:
+    """Refresh the cached OAuth token now if it would expire before a job due within the hour.
+
+    The scheduled run then starts with a valid token instead of refreshing it at fire time.
+    Returns the access token when it stays valid until the job fires, otherwise None.
+    Failures are ignored: the scheduled run can still authenticate on its own.
+    """
+    fire_at = target.timestamp() + TOKEN_REFRESH_MARGIN_SECONDS
+    if fire_at > time.time() + ACCESS_TOKEN_LIFETIME_SECONDS:
+        return None
+    try:
+        auth_manager = (spotify_client or build_spotify_client(open_browser=False)).auth_manager
+        token_info = auth_manager.validate_token(auth_manager.cache_handler.get_cached_token())
+        if token_info and token_info.get("refresh_token") and token_info.get("expires_at", 0) < fire_at:
+            token_info = auth_manager.refresh_access_token(token_info["refresh_token"])
+    except Exception:  # pragma: no cover - best effort only
+        return None
+    if not token_info or token_info.get("expires_at", 0) < fire_at:
+        return None
+    return token_info.get("access_token")
+
+
+def build_curl_playback_line(
+    args: argparse.Namespace,
+    media_type: str,
+    media_uri: str,
+    access_token: str,
+    spotify_client: Optional["spotipy.Spotify"] = None,
+) -> Optional[str]:
+    """Build a shell line that starts playback with curl using an already valid token.
+
+    Returns None when the target device cannot be resolved up front.
+    """
+    device_id: Optional[str] = None
+    if args.device:
+        try:
+            device_id = select_device(
+                spotify_client or build_spotify_client(open_browser=False), args.device
+            )
+        except Exception:  # pragma: no cover - fall back to the Python run
+            return None
+    device_query = f"device_id={device_id}" if device_id else ""
+    # printf is a shell builtin and curl reads the header from stdin (-H @-), so the
+    # token never shows up in the argv of a running process.
+    auth_header = shlex.quote(f"Authorization: Bearer {access_token}")
+    curl = f"printf '%s\\n' {auth_header} | curl -fsS --max-time 10 -X PUT -H @-"
+    if media_type == "track":
+        body = {"uris": [media_uri], "position_ms": 0}
+    else:
+        body = {"context_uri": media_uri}
+    calls = []
+    volume = getattr(args, "volume", None)
+    if volume is not None:
+        volume_query = f"volume_percent={volume}" + (f"&{device_query}" if device_query else "")
+        calls.append(f"{curl} -d '' {shlex.quote(f'{SPOTIFY_PLAYER_API}/volume?{volume_query}')}")
+    play_url = f"{SPOTIFY_PLAYER_API}/play" + (f"?{device_query}" if device_query else "")
+    calls.append(
+        f"{curl} -H 'Content-Type: application/json' -d {shlex.quote(json.dumps(body))} "
+        f"{shlex.quote(play_url)}"
+    )
+    return " && ".join(calls)
+
+
+def schedule_system_job(
+    target: datetime,
+    args: argparse.Namespace,
+    spotify_client: Optional["spotipy.Spotify"] = None,
+) -> str:
+    """Create an `at` job (or Windows scheduled task) that runs the playback at ``target``.
+
+    Pass ``spotify_client`` to reuse an already authenticated client for the token and
+    device lookups; otherwise one is built on demand.
+    """
+    access_token = prime_token_cache(target, spotify_client)
     command = build_system_command(args, target)
     log_path = Path.home() / "schedule_spotify_play.log"
     if os.name == "nt":
@@ -237,12 +446,13 @@ def schedule_system_job(target: datetime, args: argparse.Namespace) -> str:
     else:
         log_redirect = f">> {shlex.quote(str(log_path))} 2>&1"
     if os.name == "nt":
-        if shutil.which("schtasks") is None:
+        schtasks_path = find_executable("schtasks")
+        if schtasks_path is None:
             raise RuntimeError("'schtasks' command not found. Cannot create Windows scheduled task.")
         task_command = subprocess.list2cmdline(command) + f" {log_redirect}"
         task_name = f"SpotifyPlay_{target.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
         create_cmd = [
-            "schtasks",
+            schtasks_path,
             "/Create",
             "/SC",
             "ONCE",
@@ -262,15 +472,23 @@ def schedule_system_job(target: datetime, args: argparse.Namespace) -> str:
             raise RuntimeError(message)
         return f"Windows Scheduled Task '{task_name}'"
 
-    if shutil.which("at") is None:
+    at_path = find_executable("at")
+    if at_path is None:
         raise RuntimeError("'at' command not found. Install it or use another scheduling method.")
 
-    command_line = " ".join(shlex.quote(part) for part in command) + f" {log_redirect}"
+    command_line = f"{shlex.join(command)} {log_redirect}"
+    if access_token and not getattr(args, "no_curl", False) and find_executable("curl"):
+        media_type, media_uri = parse_media_reference(args.media)
+        curl_line = build_curl_playback_line(
+            args, media_type, media_uri, access_token, spotify_client
+        )
+        if curl_line:
+            # Skip the Python start-up at fire time; fall back to it if curl is refused.
+            command_line = f"{{ {curl_line}; }} {log_redirect} || {command_line}"
     at_time = target.strftime("%Y%m%d%H%M")
     activate_script = find_venv_activation_script()
 
     script_lines = [
-        "#!/bin/sh",
         "set -e",
         f"cd {shlex.quote(str(SCRIPT_DIR))}",
         f"sleep {target.second}"
@@ -280,30 +498,19 @@ def schedule_system_job(target: datetime, args: argparse.Namespace) -> str:
     script_lines.append(command_line)
     script_content = "\n".join(script_lines) + "\n"
 
-    tmp_script: Optional[Path] = None
-    try:
-        with tempfile.NamedTemporaryFile(
-            "w", delete=False, encoding="utf-8", dir=str(SCRIPT_DIR), suffix="_at_job.sh"
-        ) as handle:
-            handle.write(script_content)
-            tmp_script = Path(handle.name)
-
-        result = subprocess.run(
-            ["at", "-t", at_time, "-f", str(tmp_script)],
-            capture_output=True,
-            text=True,
-        )
-    finally:
-        if tmp_script is not None:
-            try:
-                tmp_script.unlink()
-            except OSError:
-                pass
+    # at(1) reads the job from stdin and hands it to /bin/sh, so no temporary file is needed.
+    result = subprocess.run(
+        [at_path, "-t", at_time],
+        input=script_content,
+        capture_output=True,
+        text=True,
+    )
 
     if result.returncode != 0:
         message = result.stderr.strip() or result.stdout.strip() or "Unable to schedule job with 'at'."
         raise RuntimeError(message)
-    print(f"Scheduled job script: {script_content}\n at path: {tmp_script}")
+    printable_script = script_content.replace(access_token, "<access-token>") if access_token else script_content
+    print(f"Scheduled job script: {printable_script}")
     return result.stdout.strip() or result.stderr.strip() or "at job scheduled"
 
 
@@ -347,6 +554,11 @@ def main() -> None:
         type=int,
         help="Set playback volume (0-100) before starting media.",
     )
+    parser.add_argument(
+        "--no-curl",
+        action="store_true",
+        help="With --system-schedule, always run this script at fire time instead of a direct curl request.",
+    )
     parser.add_argument(
         "--list-devices",
         action="store_true",
@@ -398,6 +610,8 @@ def main() -> None:
     if args.system_schedule:
         if target is None:
             parser.error("--system-schedule requires a future time via --at or --time/--date.")
+        # Hand the canonical URI to the scheduled run so it hits the URI fast path.
+        args.media = media_uri
         try:
             job_label = schedule_system_job(target, args)
         except RuntimeError as exc:
@@ -436,6 +650,7 @@ def main() -> None:
     else:
         print(f"Starting {media_type} playback now.")
 
+    spotipy = _import_spotipy()
     try:
         start_playback(
             spotify_client,
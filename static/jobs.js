@@ -0,0 +1,81 @@
+// Fill the scheduled-jobs sidebar from the server-sent event stream.
+(function () {
+  const initialList = document.getElementById("job-list");
+  if (!initialList || !document.getElementById("job-status") || !window.EventSource) {
+    return;
+  }
+  // Removals replace these elements, so always look them up again.
+  const jobList = () => document.getElementById("job-list");
+  const jobStatus = () => document.getElementById("job-status");
+
+  const source = new EventSource(initialList.dataset.streamUrl);
+  source.addEventListener("job", (event) => {
+    jobList().insertAdjacentHTML("beforeend", event.data);
+    jobStatus().hidden = true;
+  });
+  source.addEventListener("jobs-error", (event) => {
+    const status = jobStatus();
+    status.textContent = event.data;
+    status.className = "sidebar-error";
+    status.hidden = false;
+  });
+  source.addEventListener("done", () => {
+    // Close before the browser's automatic reconnect kicks in.
+    source.close();
+    const status = jobStatus();
+    if (!jobList().children.length && status.className !== "sidebar-error") {
+      status.textContent = "No pending jobs.";
+    }
+  });
+  source.onerror = () => {
+    source.close();
+    if (!jobList().children.length) {
+      const status = jobStatus();
+      status.textContent = "Unable to load jobs.";
+      status.className = "sidebar-error";
+    }
+  };
+
+  // Remove jobs in place: the server answers with the refreshed sidebar partial.
+  document.addEventListener("submit", async (event) => {
+    const form = event.target.closest("#job-list form");
+    if (!form) {
+      return;
+    }
+    event.preventDefault();
+    // Any failure falls back to a normal form post, which redirects back to the page.
+    let html;
+    try {
+      const response = await fetch(form.action, {
+        method: "POST",
+        body: new FormData(form),
+        headers: { "X-Requested-With": "fetch" },
+      });
+      if (!response.ok) {
+        form.submit();
+        return;
+      }
+      html = await response.text();
+    } catch {
+      form.submit();
+      return;
+    }
+    const fragment = document.createElement("template");
+    fragment.innerHTML = html;
+    // The partial holds the complete list, so rows still streaming in are not needed.
+    source.close();
+    for (const selector of ["#job-list", "#job-status"]) {
+      const replacement = fragment.content.querySelector(selector);
+      const current = document.querySelector(selector);
+      if (replacement && current) {
+        current.replaceWith(replacement);
+      }
+    }
+    // Swap the flashed messages only; other notices, such as device errors, stay.
+    const messages = document.querySelector(".messages");
+    if (messages) {
+      messages.querySelectorAll("[data-flash]").forEach((item) => item.remove());
+      messages.prepend(...fragment.content.querySelectorAll("[data-flash]"));
+    }
+  });
+})();
@@ -1,76 +1,271 @@
 from __future__ import annotations
 
+import hashlib
 import os
-import shlex
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from types import SimpleNamespace
 from typing import Any, Optional
 
-import shutil
 import subprocess
-from flask import Flask, flash, redirect, render_template, request, url_for
+from flask import (
+    Flask,
+    Response,
+    flash,
+    redirect,
+    render_template,
+    request,
+    session,
+    stream_with_context,
+    url_for,
+)
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup, escape
 
 from schedule_spotify_play import (
+    SCRIPT_PATH,
     build_spotify_client,
     determine_target_datetime,
+    find_executable,
     parse_media_reference,
     schedule_system_job,
 )
 
 app = Flask(__name__)
+# Persist compiled templates across restarts and drop block-tag whitespace from responses.
+# Template auto-reload stays tied to debug mode, Flask's default.
+app.jinja_options = {
+    **app.jinja_options,
+    "bytecode_cache": FileSystemBytecodeCache(),
+    "trim_blocks": True,
+    "lstrip_blocks": True,
+}
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "dev-secret-key")
 
 
-def fetch_devices(client: Optional[Any] = None) -> list[dict]:
-    spotify_client = client or build_spotify_client(open_browser=False)
+# Device lists change rarely; a short TTL spares a Spotify round-trip on every page load.
+DEVICE_CACHE_TTL_SECONDS = 10.0
+_device_cache: dict[str, Any] = {"at": float("-inf"), "devices": []}
+_spotify_client: Optional[Any] = None
+_spotify_client_lock = threading.Lock()
+# Only the default volume on the form comes from this, so it may lag a little.
+PLAYBACK_CACHE_TTL_SECONDS = 120.0
+_playback_cache: dict[str, Any] = {"at": float("-inf"), "playback": None}
+
+# Track/album/playlist/artist metadata rarely changes, so job listings reuse it across page loads.
+MEDIA_CACHE_TTL_SECONDS = 900.0
+MEDIA_CACHE_MAX_ENTRIES = 1024
+_media_cache: dict[tuple[str, str], tuple[float, dict[str, Any]]] = {}
+_media_cache_lock = threading.Lock()
+# The last job listing, keyed by a digest of atq's output; see list_system_jobs.
+JOBS_CACHE_TTL_SECONDS = 60.0
+_jobs_cache: dict[str, Any] = {"key": None, "at": float("-inf"), "jobs": []}
+_AT_SPOOL_DIR = next(
+    (
+        path
+        for path in ("/var/spool/cron/atjobs", "/var/spool/atjobs", "/var/spool/at")
+        if os.path.isdir(path)
+    ),
+    None,
+)
+
+# atq: "<id>\t<weekday> <month> <day> <HH:MM:SS> <year> <queue> <user>"; trailing fields may be absent.
+_ATQ_LINE_PATTERN = re.compile(
+    r"(?P<id>\S+)\s*(?P<details>(?:(?P<scheduled_for>(?:\S+\s+){4}\S+)"
+    r"(?:\s+(?P<queue>\S+)(?:\s+(?P<user>\S+))?)?)?.*)"
+)
+
+_MONTH_ABBR = {
+    name: number
+    for number, name in enumerate(
+        ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1
+    )
+}
+
+# Scheduled commands run the CLI by absolute path; the media argument follows it.
+_AT_SCRIPT_NAME = SCRIPT_PATH.name
+_AT_SCRIPT_SUFFIX = "/" + _AT_SCRIPT_NAME
+
+# Scheduled command lines only quote whole words, so one findall splits them like shlex.
+_COMMAND_TOKEN_PATTERN = re.compile(r"'([^']*)'|\"([^\"]*)\"|(\S+)")
+
+# Jobs using the curl fast path embed a live access token; never let it reach a page.
+# The header is one shell-quoted word, so the token runs up to the quote that closes it.
+_BEARER_TOKEN_PATTERN = re.compile(r"(Bearer\s+)(?:\S*?(?='(?:\s|$))|[^\s'\"]+)")
+
+# Lines of an `at -c` dump that belong to at's environment preamble or our own script setup.
+# Newer at releases also wrap the job in `${SHELL:-/bin/sh} << 'marcinDELIMITER…'`.
+_AT_PREAMBLE_PATTERN = re.compile(
+    r"#|export |cd |sleep |\. |umask|trap |marcinDELIMITER|\$\{SHELL|[A-Za-z_][A-Za-z0-9_]*="
+)
+
+# Overlaps Spotify calls that would otherwise run back to back; they mostly wait on I/O.
+_job_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="jobs")
+
+# media type -> (client method, response key, max IDs per request)
+_BULK_MEDIA_ENDPOINTS = {
+    "track": ("tracks", "tracks", 50),
+    "album": ("albums", "albums", 20),
+    "artist": ("artists", "artists", 50),
+}
+
+
+def get_spotify_client() -> Any:
+    """Return the process-wide Spotify client so the OAuth token cache is reused."""
+    global _spotify_client
+    if _spotify_client is None:
+        with _spotify_client_lock:
+            if _spotify_client is None:
+                client = build_spotify_client(open_browser=False)
+                _serialize_token_refresh(client.auth_manager)
+                _spotify_client = client
+    return _spotify_client
+
+
+def _serialize_token_refresh(auth_manager: Any) -> None:
+    """Let only one thread at a time read, validate or refresh the shared OAuth token.
+
+    spotipy does not lock around refreshing, so concurrent calls through the shared client
+    (pool threads, parallel requests) that all find the token expired would each refresh
+    it and write the cache file at once. A re-entrant lock, as these methods call each other.
+    """
+    token_lock = threading.RLock()
+    for name in ("get_access_token", "validate_token", "refresh_access_token"):
+        method = getattr(auth_manager, name)
+
+        def locked(*args: Any, _method: Any = method, **kwargs: Any) -> Any:
+            with token_lock:
+                return _method(*args, **kwargs)
+
+        setattr(auth_manager, name, locked)
+
+
+def fetch_devices(client: Optional[Any] = None, *, refresh: bool = False) -> list[dict]:
+    now = time.monotonic()
+    if not refresh and now - _device_cache["at"] < DEVICE_CACHE_TTL_SECONDS:
+        return _device_cache["devices"]
+    spotify_client = client or get_spotify_client()
     payload = spotify_client.devices()
     devices = payload.get("devices", []) if isinstance(payload, dict) else []
-    devices.sort(key=lambda item: (item.get("name") or "").lower())
+    devices.sort(key=lambda item: (item.get("name") or "").casefold())
+    _device_cache["at"] = now
+    _device_cache["devices"] = devices
     return devices
 
 
-def _inspect_at_job_details(job_id: str) -> Optional[dict[str, Any]]:
+def _cached_current_playback(client: Any) -> Optional[dict]:
+    now = time.monotonic()
+    if now - _playback_cache["at"] < PLAYBACK_CACHE_TTL_SECONDS:
+        return _playback_cache["playback"]
+    playback = client.current_playback()
+    _playback_cache["at"] = now
+    _playback_cache["playback"] = playback if isinstance(playback, dict) else None
+    return _playback_cache["playback"]
+
+
+def _render_device_options(devices: list[dict]) -> Markup:
+    """Pre-render the device <option> list in one join instead of a Jinja loop."""
+    options = []
+    for device in devices:
+        name = escape(device.get("name") or "")
+        device_type = escape(device.get("type") or "")
+        options.append(f'<option value="{name}">{name} ({device_type})</option>')
+    return Markup("".join(options))
+
+
+def _read_spooled_at_jobs(job_ids: list[str]) -> dict[str, str]:
+    """Read job scripts straight from at's spool directory when this user is allowed to."""
+    if _AT_SPOOL_DIR is None:
+        return {}
+    # Spool files are named <queue><job number:05x><start minute:08x>.
+    wanted: dict[str, str] = {}
+    for job_id in job_ids:
+        try:
+            wanted[f"{int(job_id):05x}"] = job_id
+        except ValueError:
+            continue
+    scripts: dict[str, str] = {}
+    try:
+        with os.scandir(_AT_SPOOL_DIR) as entries:
+            for entry in entries:
+                if len(entry.name) != 14:
+                    continue
+                job_id = wanted.get(entry.name[1:6])
+                if job_id is None:
+                    continue
+                with open(entry.path, encoding="utf-8", errors="replace") as handle:
+                    scripts[job_id] = handle.read()
+    except OSError:
+        return scripts
+    return scripts
+
+
+# Dumps every requested job in one shell; each dump is preceded by "<sentinel> <job id>".
+_AT_DUMP_SCRIPT = 'at=$1 sentinel=$2; shift 2; for job; do echo "$sentinel $job"; "$at" -c "$job" 2>/dev/null; done'
+
+
+def _dump_at_jobs(job_ids: list[str]) -> dict[str, str]:
+    """Run `at -c` for all jobs from a single /bin/sh instead of one subprocess per job."""
+    at_path = find_executable("at")
+    if at_path is None or not job_ids:
+        return {}
+    sentinel = f"--- spotify-scheduler job {uuid.uuid4().hex}"
     try:
         result = subprocess.run(
-            ["at", "-c", job_id], capture_output=True, text=True, check=False
+            ["/bin/sh", "-c", _AT_DUMP_SCRIPT, "sh", at_path, sentinel, *job_ids],
+            capture_output=True,
+            text=True,
+            check=False,
         )
     except FileNotFoundError:
-        return None
-    if result.returncode != 0:
-        return None
-    lines = result.stdout.splitlines()
+        return {}
+    scripts: dict[str, str] = {}
+    for chunk in result.stdout.split(sentinel + " ")[1:]:
+        job_id, _, script = chunk.partition("\n")
+        if script:
+            scripts[job_id] = script
+    return scripts
+
+
+def _bulk_inspect_at_jobs(job_ids: list[str]) -> dict[str, dict[str, Any]]:
+    scripts = _read_spooled_at_jobs(job_ids)
+    missing = [job_id for job_id in job_ids if job_id not in scripts]
+    if missing:
+        scripts.update(_dump_at_jobs(missing))
+    inspected: dict[str, dict[str, Any]] = {}
+    for job_id, script in scripts.items():
+        details = _parse_at_job_script(script)
+        if details is not None:
+            inspected[job_id] = details
+    return inspected
+
+
+def _inspect_at_job_details(job_id: str) -> Optional[dict[str, Any]]:
+    return _bulk_inspect_at_jobs([job_id]).get(job_id)
+
+
+def _parse_at_job_script(script: str) -> Optional[dict[str, Any]]:
+    # Our command is the script's last line and its `sleep` sits just above it, so one
+    # walk from the bottom finds both without touching at's environment preamble.
+    command: Optional[str] = None
     sleep_seconds: Optional[int] = None
-    for line in lines:
-        stripped = line.strip()
-        if not stripped:
+    for line in reversed(script.splitlines()):
+        if not line or line.isspace():
             continue
+        stripped = line.strip()
         if stripped.startswith("sleep "):
             parts = stripped.split()
-            if len(parts) >= 2:
-                try:
-                    sleep_seconds = int(parts[1])
-                except ValueError:
-                    sleep_seconds = None
-            continue
-    command: Optional[str] = None
-    for line in reversed(lines):
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-        if stripped.startswith("export "):
-            continue
-        if stripped.startswith("cd ") or stripped.startswith("sleep "):
-            continue
-        if stripped.startswith(". "):
-            continue
-        if stripped.startswith("umask") or stripped.startswith("trap "):
-            continue
-        if "=" in stripped:
-            key = stripped.split("=", 1)[0]
-            if key.isidentifier():
-                continue
-        command = stripped
-        break
+            try:
+                sleep_seconds = int(parts[1])
+            except (IndexError, ValueError):
+                sleep_seconds = None
+            break
+        if command is None and not _AT_PREAMBLE_PATTERN.match(stripped):
+            command = _BEARER_TOKEN_PATTERN.sub(r"\1<access-token>", stripped)
     if command is None and sleep_seconds is None:
         return None
     return {"command": command, "sleep_seconds": sleep_seconds}
@@ -83,55 +278,36 @@ def inspect_at_job_command(job_id: str) -> Optional[str]:
     return details.get("command")
 
 
-def _extract_media_from_command(command: Optional[str]) -> Optional[tuple[str, str]]:
-    if not command:
-        return None
-    try:
-        tokens = shlex.split(command)
-    except ValueError:
-        return None
-
-    script_index = None
-    for idx, part in enumerate(tokens):
-        if part.endswith("schedule_spotify_play.py"):
-            script_index = idx
-            break
-        if os.path.basename(part) == "schedule_spotify_play.py":
-            script_index = idx
-            break
-    if script_index is None:
-        return None
-    media_index = script_index + 1
-    if media_index >= len(tokens):
-        return None
-    candidate = tokens[media_index]
-    try:
-        media_type, media_uri = parse_media_reference(candidate)
-    except ValueError:
-        return None
-    return media_type, media_uri
-
-
-def _extract_volume_from_command(command: Optional[str]) -> Optional[int]:
+def _tokenize_at_command(command: Optional[str]) -> list[str]:
     if not command:
-        return None
-    try:
-        tokens = shlex.split(command)
-    except ValueError:
-        return None
-    for idx, token in enumerate(tokens):
-        if token == "--volume" and idx + 1 < len(tokens):
-            candidate = tokens[idx + 1]
+        return []
+    if "'" not in command and '"' not in command:
+        return command.split()
+    return [
+        single or double or bare
+        for single, double, bare in _COMMAND_TOKEN_PATTERN.findall(command)
+    ]
+
+
+def _extract_media_from_command(tokens: list[str]) -> Optional[tuple[str, str]]:
+    for idx, token in enumerate(tokens[:-1]):
+        if token == _AT_SCRIPT_NAME or token.endswith(_AT_SCRIPT_SUFFIX):
             try:
-                value = int(candidate)
+                return parse_media_reference(tokens[idx + 1])
             except ValueError:
                 return None
-            if 0 <= value <= 100:
-                return value
-            return None
     return None
 
 
+def _extract_volume_from_command(tokens: list[str]) -> Optional[int]:
+    try:
+        idx = tokens.index("--volume")
+        value = int(tokens[idx + 1])
+    except (ValueError, IndexError):
+        return None
+    return value if 0 <= value <= 100 else None
+
+
 def _format_duration_ms(value: Any) -> Optional[str]:
     try:
         duration_ms = int(value)
@@ -147,145 +323,230 @@ def _format_duration_ms(value: Any) -> Optional[str]:
     return f"{minutes}:{seconds:02d}"
 
 
+def _cached_media(media_type: str, media_uri: str, now: float) -> Optional[dict[str, Any]]:
+    # A single get: pool threads may evict the entry at any moment (see _store_media).
+    cached = _media_cache.get((media_type, media_uri))
+    if cached is None or now - cached[0] >= MEDIA_CACHE_TTL_SECONDS:
+        return None
+    return cached[1]
+
+
+def _store_media(
+    media_type: str, media_uri: str, now: float, description: dict[str, Any]
+) -> None:
+    """Cache a description, first dropping expired entries and then the oldest when full."""
+    key = (media_type, media_uri)
+    # Playlist lookups store from pool threads, so eviction must not race with writes.
+    with _media_cache_lock:
+        _media_cache.pop(key, None)
+        if len(_media_cache) >= MEDIA_CACHE_MAX_ENTRIES:
+            expired = [
+                cached_key
+                for cached_key, (cached_at, _) in _media_cache.items()
+                if now - cached_at >= MEDIA_CACHE_TTL_SECONDS
+            ]
+            for cached_key in expired:
+                del _media_cache[cached_key]
+            # Entries are kept in write order, so the first ones are the oldest.
+            while len(_media_cache) >= MEDIA_CACHE_MAX_ENTRIES:
+                del _media_cache[next(iter(_media_cache))]
+        _media_cache[key] = (now, description)
+
+
 def _describe_spotify_media(
     spotify_client: Optional[Any], media_type: str, media_uri: str
 ) -> Optional[dict[str, Any]]:
     if spotify_client is None:
         return None
+    now = time.monotonic()
+    description = _cached_media(media_type, media_uri, now)
+    if description is not None:
+        return description
+    description = _fetch_spotify_media(spotify_client, media_type, media_uri)
+    if description is not None:
+        _store_media(media_type, media_uri, now, description)
+    return description
+
+
+def _fetch_spotify_media(
+    spotify_client: Any, media_type: str, media_uri: str
+) -> Optional[dict[str, Any]]:
+    if media_type not in _MEDIA_FORMATTERS:
+        return None
     try:
-        if media_type == "track":
-            data = spotify_client.track(media_uri)
-            if not isinstance(data, dict):
-                return None
-            name = data.get("name")
-            artists = ", ".join(
-                artist.get("name")
-                for artist in data.get("artists", [])
-                if isinstance(artist, dict) and artist.get("name")
-            )
-            album = None
-            album_payload = data.get("album")
-            if isinstance(album_payload, dict):
-                album = album_payload.get("name")
-            parts = []
-            if name:
-                parts.append({"identifier": "track", "text": name})
-            if artists:
-                parts.append({"identifier": "artist", "text": artists})
-            if album:
-                parts.append({"identifier": "album", "text": album})
-            pieces = [item["text"] for item in parts]
-            summary = "Track: " + " — ".join(pieces) if pieces else None
-            duration_label = _format_duration_ms(data.get("duration_ms"))
-            return {
-                "summary": summary,
-                "type_label": "Track",
-                "parts": parts,
-                "duration_ms": data.get("duration_ms"),
-                "duration_label": duration_label,
-            }
+        data = getattr(spotify_client, media_type)(media_uri)
+    except Exception:
+        return None
+    return _format_spotify_media(media_type, data)
+
+
+def _prefetch_spotify_media(
+    spotify_client: Any,
+    wanted: dict[str, set[str]],
+    descriptions: dict[tuple[str, str], Optional[dict[str, Any]]],
+) -> None:
+    """Fill the media cache using Spotify's multi-ID endpoints (playlists have none).
+
+    Every URI looked up here, including failed ones, is also recorded in the listing's
+    ``descriptions`` so building the job rows never goes back to the network for it.
+    """
+    now = time.monotonic()
+    for media_type, (method_name, response_key, batch_size) in _BULK_MEDIA_ENDPOINTS.items():
+        missing = [
+            media_uri
+            for media_uri in sorted(wanted.get(media_type, ()))
+            if _cached_media(media_type, media_uri, now) is None
+        ]
+        fetch_many = getattr(spotify_client, method_name)
+        for offset in range(0, len(missing), batch_size):
+            batch = missing[offset : offset + batch_size]
+            try:
+                payload = fetch_many(batch)
+            except Exception:
+                payload = None
+            items = payload.get(response_key) if isinstance(payload, dict) else None
+            items = list(items or ())
+            for position, media_uri in enumerate(batch):
+                data = items[position] if position < len(items) else None
+                description = _format_spotify_media(media_type, data)
+                descriptions[(media_type, media_uri)] = description
+                if description is not None:
+                    _store_media(media_type, media_uri, now, description)
+
+    playlists = [
+        media_uri
+        for media_uri in wanted.get("playlist", ())
+        if _cached_media("playlist", media_uri, now) is None
+    ]
+    # Playlists can only be fetched one at a time; overlap those round-trips instead.
+    fetched = _job_pool.map(
+        lambda media_uri: _describe_spotify_media(spotify_client, "playlist", media_uri), playlists
+    )
+    for media_uri, description in zip(playlists, fetched):
+        descriptions[("playlist", media_uri)] = description
 
-        if media_type == "playlist":
-            data = spotify_client.playlist(media_uri)
-            if not isinstance(data, dict):
-                return None
-            name = data.get("name")
-            owner_payload = data.get("owner")
-            owner = None
-            if isinstance(owner_payload, dict):
-                owner = owner_payload.get("display_name") or owner_payload.get("id")
-            parts = []
-            if name:
-                parts.append({"identifier": "playlist", "text": name})
-            if owner:
-                parts.append({"identifier": "owner", "text": owner})
-            pieces = [item["text"] for item in parts]
-            summary = "Playlist: " + " — ".join(pieces) if pieces else None
-            return {
-                "summary": summary,
-                "type_label": "Playlist",
-                "parts": parts,
-            }
 
-        if media_type == "album":
-            data = spotify_client.album(media_uri)
-            if not isinstance(data, dict):
-                return None
-            name = data.get("name")
-            artists = ", ".join(
-                artist.get("name")
-                for artist in data.get("artists", [])
-                if isinstance(artist, dict) and artist.get("name")
-            )
-            parts = []
-            if name:
-                parts.append({"identifier": "album", "text": name})
-            if artists:
-                parts.append({"identifier": "artist", "text": artists})
-            pieces = [item["text"] for item in parts]
-            summary = "Album: " + " — ".join(pieces) if pieces else None
-            return {
-                "summary": summary,
-                "type_label": "Album",
-                "parts": parts,
-            }
+def _join_artist_names(data: dict) -> str:
+    return ", ".join(
+        artist.get("name")
+        for artist in (data.get("artists") or ())
+        if isinstance(artist, dict) and artist.get("name")
+    )
 
-        if media_type == "artist":
-            data = spotify_client.artist(media_uri)
-            if not isinstance(data, dict):
-                return None
-            name = data.get("name")
-            if not name:
-                return None
-            return {
-                "summary": f"Artist: {name}",
-                "type_label": "Artist",
-                "parts": [{"identifier": "artist", "text": name}],
-            }
-    except Exception:
+
+def _assemble_parts(type_label: str, pairs: tuple[tuple[str, Any], ...]) -> dict[str, Any]:
+    """Build the labelled parts and " — "-joined summary from (identifier, text) pairs."""
+    parts = [{"identifier": identifier, "text": text} for identifier, text in pairs if text]
+    summary = (
+        f"{type_label}: " + " — ".join(part["text"] for part in parts) if parts else None
+    )
+    return {"summary": summary, "type_label": type_label, "parts": parts}
+
+
+def _format_track_payload(data: dict) -> Optional[dict[str, Any]]:
+    album_payload = data.get("album")
+    album = album_payload.get("name") if isinstance(album_payload, dict) else None
+    description = _assemble_parts(
+        "Track",
+        (("track", data.get("name")), ("artist", _join_artist_names(data)), ("album", album)),
+    )
+    description["duration_ms"] = data.get("duration_ms")
+    description["duration_label"] = _format_duration_ms(data.get("duration_ms"))
+    return description
+
+
+def _format_playlist_payload(data: dict) -> Optional[dict[str, Any]]:
+    owner_payload = data.get("owner")
+    owner = None
+    if isinstance(owner_payload, dict):
+        owner = owner_payload.get("display_name") or owner_payload.get("id")
+    return _assemble_parts("Playlist", (("playlist", data.get("name")), ("owner", owner)))
+
+
+def _format_album_payload(data: dict) -> Optional[dict[str, Any]]:
+    return _assemble_parts(
+        "Album", (("album", data.get("name")), ("artist", _join_artist_names(data)))
+    )
+
+
+def _format_artist_payload(data: dict) -> Optional[dict[str, Any]]:
+    if not data.get("name"):
         return None
-    return None
+    return _assemble_parts("Artist", (("artist", data["name"]),))
+
+
+# Keyed by media type, which is also the name of the matching single-item client method.
+_MEDIA_FORMATTERS = {
+    "track": _format_track_payload,
+    "playlist": _format_playlist_payload,
+    "album": _format_album_payload,
+    "artist": _format_artist_payload,
+}
+
+
+def _format_spotify_media(media_type: str, data: Any) -> Optional[dict[str, Any]]:
+    formatter = _MEDIA_FORMATTERS.get(media_type)
+    if formatter is None or not isinstance(data, dict):
+        return None
+    return formatter(data)
+
+
+def _fallback_media_details(media_type: str, media_uri: str) -> dict:
+    """Media fields for a job whose Spotify metadata is unavailable: just type and URI."""
+    media_type_label = media_type.title()
+    return {
+        "media_type": media_type,
+        "media_uri": media_uri,
+        "media_summary": f"{media_type_label}: {media_uri}",
+        "media_type_label": media_type_label,
+        "media_parts": [{"identifier": "uri", "text": media_uri}],
+        "media_duration_ms": None,
+        "media_duration_label": None,
+    }
 
 
 def _build_job_media_details(
-    command: Optional[str], spotify_client: Optional[Any]
+    media: Optional[tuple[str, str]],
+    spotify_client: Optional[Any],
+    descriptions: dict[tuple[str, str], Optional[dict[str, Any]]],
 ) -> Optional[dict]:
-    media = _extract_media_from_command(command)
     if not media:
         return None
     media_type, media_uri = media
-    description = _describe_spotify_media(spotify_client, media_type, media_uri)
+    # `descriptions` lives for one listing and also remembers failed lookups, which the
+    # TTL cache does not, so jobs sharing an unavailable URI try Spotify only once.
+    if media in descriptions:
+        description = descriptions[media]
+    else:
+        description = _describe_spotify_media(spotify_client, media_type, media_uri)
+        descriptions[media] = description
+    if description is None:
+        return _fallback_media_details(media_type, media_uri)
     media_type_label = media_type.title()
     media_parts: list[dict[str, str]] = []
-    summary: Optional[str]
     duration_ms: Optional[int] = None
-    duration_label: Optional[str] = None
-    if description is None:
-        summary = f"{media_type_label}: {media_uri}"
-        media_parts.append({"identifier": "uri", "text": media_uri})
-    else:
-        summary = description.get("summary") or f"{media_type_label}: {media_uri}"
-        media_type_label = description.get("type_label") or media_type_label
-        duration_value = description.get("duration_ms")
-        if duration_value is not None:
-            try:
-                duration_ms = int(duration_value)
-            except (TypeError, ValueError):
-                duration_ms = None
-        duration_label = description.get("duration_label")
-        for part in description.get("parts", []):
-            text = part.get("text")
-            identifier = part.get("identifier")
-            if not text or not identifier:
-                continue
-            media_parts.append(
-                {
-                    "identifier": str(identifier),
-                    "text": str(text),
-                }
-            )
-        if not media_parts and summary:
-            media_parts.append({"identifier": "value", "text": summary})
+    summary = description.get("summary") or f"{media_type_label}: {media_uri}"
+    media_type_label = description.get("type_label") or media_type_label
+    duration_value = description.get("duration_ms")
+    if duration_value is not None:
+        try:
+            duration_ms = int(duration_value)
+        except (TypeError, ValueError):
+            duration_ms = None
+    duration_label = description.get("duration_label")
+    for part in description.get("parts", []):
+        text = part.get("text")
+        identifier = part.get("identifier")
+        if not text or not identifier:
+            continue
+        media_parts.append(
+            {
+                "identifier": str(identifier),
+                "text": str(text),
+            }
+        )
+    if not media_parts and summary:
+        media_parts.append({"identifier": "value", "text": summary})
     return {
         "media_type": media_type,
         "media_uri": media_uri,
@@ -297,45 +558,67 @@ def _build_job_media_details(
     }
 
 
+def _parse_at_timestamp(text: str) -> Optional[datetime]:
+    """Parse atq's "Fri Oct 16 07:30:00 2026" without going through strptime."""
+    try:
+        _, month, day, clock, year = text.split()
+        hour, minute, second = clock.split(":")
+        return datetime(
+            int(year), _MONTH_ABBR[month], int(day), int(hour), int(minute), int(second)
+        )
+    except (KeyError, ValueError):
+        return None
+
+
 def list_system_jobs(*, spotify_client: Optional[Any] = None) -> tuple[list[dict], Optional[str]]:
     if os.name == "nt":
         return [], "Job listing via the web UI is not yet supported on Windows."
-    if shutil.which("atq") is None:
+    atq_path = find_executable("atq")
+    if atq_path is None:
         return [], "'atq' command not found. Install the 'at' package to manage jobs."
 
-    result = subprocess.run(["atq"], capture_output=True, text=True, check=False)
-    if result.returncode != 0:
-        message = result.stderr.strip() or result.stdout.strip() or "Unable to list jobs."
-        return [], message
+    # Parse atq's lines as they arrive rather than after its whole output is buffered.
+    matches = []
+    signature = hashlib.blake2b(digest_size=16)
+    with subprocess.Popen(
+        [atq_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    ) as proc:
+        for raw_line in proc.stdout:
+            signature.update(raw_line.encode())
+            match = _ATQ_LINE_PATTERN.match(raw_line.strip())
+            if match:
+                matches.append(match)
+        stderr = proc.stderr.read()
+    if proc.returncode != 0:
+        return [], stderr.strip() or "Unable to list jobs."
+
+    # An unchanged queue means unchanged job scripts, so reuse the last listing for a while.
+    key = (signature.hexdigest(), spotify_client is None)
+    now = time.monotonic()
+    if _jobs_cache["key"] == key and now - _jobs_cache["at"] < JOBS_CACHE_TTL_SECONDS:
+        return _jobs_cache["jobs"], None
+    jobs = _build_job_payloads(matches, spotify_client)
+    _jobs_cache.update(key=key, at=now, jobs=jobs)
+    return jobs, None
+
+
+def invalidate_jobs_cache() -> None:
+    _jobs_cache["key"] = None
+
+
+def _build_job_payloads(matches: list[re.Match[str]], spotify_client: Optional[Any]) -> list[dict]:
+    # One spool scan plus at most one shell for all `at -c` dumps, however many jobs exist.
+    inspected = _bulk_inspect_at_jobs([match["id"] for match in matches])
 
     jobs: list[dict] = []
-    for raw_line in result.stdout.splitlines():
-        line = raw_line.strip()
-        if not line:
-            continue
-        if "\t" in line:
-            job_id, rest = line.split("\t", 1)
-        else:
-            parts = line.split(None, 1)
-            job_id = parts[0]
-            rest = parts[1] if len(parts) > 1 else ""
-        details = rest.strip()
-        tokens = details.split()
-        scheduled_for = None
-        scheduled_dt: Optional[datetime] = None
-        queue = None
-        user = None
-        if len(tokens) >= 5:
-            scheduled_for = " ".join(tokens[:5])
-            try:
-                scheduled_dt = datetime.strptime(scheduled_for, "%a %b %d %H:%M:%S %Y")
-            except ValueError:
-                scheduled_dt = None
-        if len(tokens) >= 6:
-            queue = tokens[5]
-        if len(tokens) >= 7:
-            user = tokens[6]
-        job_details = _inspect_at_job_details(job_id)
+    job_media: list[tuple[dict, Optional[tuple[str, str]]]] = []
+    wanted_media: dict[str, set[str]] = {}
+    for match in matches:
+        job_details = inspected.get(match["id"])
+        job_id, details, scheduled_for, queue, user = match.group(
+            "id", "details", "scheduled_for", "queue", "user"
+        )
+        scheduled_dt = _parse_at_timestamp(scheduled_for) if scheduled_for else None
         command = job_details.get("command") if job_details else None
         sleep_seconds = job_details.get("sleep_seconds") if job_details else None
         playback_dt: Optional[datetime] = None
@@ -348,8 +631,9 @@ def list_system_jobs(*, spotify_client: Optional[Any] = None) -> tuple[list[dict
                 except (TypeError, ValueError):
                     offset_seconds = 0
             playback_dt = scheduled_dt + timedelta(seconds=offset_seconds)
-            playback_label = playback_dt.strftime("%a %b %d %H:%M:%S %Y")
-        volume = _extract_volume_from_command(command)
+            playback_label = playback_dt.isoformat(sep=" ", timespec="seconds")
+        tokens = _tokenize_at_command(command)
+        volume = _extract_volume_from_command(tokens)
         volume_label = f"{volume}%" if volume is not None else None
         job_payload = {
             "id": job_id,
@@ -365,11 +649,28 @@ def list_system_jobs(*, spotify_client: Optional[Any] = None) -> tuple[list[dict
             "volume": volume,
             "volume_label": volume_label,
         }
-        media_details = _build_job_media_details(command, spotify_client)
+        media = _extract_media_from_command(tokens)
+        if media:
+            wanted_media.setdefault(media[0], set()).add(media[1])
+        job_media.append((job_payload, media))
+        jobs.append(job_payload)
+
+    if spotify_client is None:
+        # Without Spotify access there is nothing to enrich; show the bare URIs.
+        for job_payload, media in job_media:
+            if media:
+                job_payload.update(_fallback_media_details(*media))
+        return jobs
+
+    # Resolve metadata for all jobs at once so N jobs cost a few bulk requests, not N.
+    descriptions: dict[tuple[str, str], Optional[dict[str, Any]]] = {}
+    if wanted_media:
+        _prefetch_spotify_media(spotify_client, wanted_media, descriptions)
+    for job_payload, media in job_media:
+        media_details = _build_job_media_details(media, spotify_client, descriptions)
         if media_details:
             job_payload.update(media_details)
-        jobs.append(job_payload)
-    return jobs, None
+    return jobs
 
 
 def remove_system_job(job_id: str) -> tuple[bool, str]:
@@ -380,29 +681,20 @@ def remove_system_job(job_id: str) -> tuple[bool, str]:
         return False, "Job id must be numeric."
     if os.name == "nt":
         return False, "Removing jobs from the web UI is not yet supported on Windows."
-    if shutil.which("atrm") is None:
+    atrm_path = find_executable("atrm")
+    if atrm_path is None:
         return False, "'atrm' command not found. Install the 'at' package to manage jobs."
 
-    result = subprocess.run(["atrm", job_id], capture_output=True, text=True, check=False)
+    result = subprocess.run([atrm_path, job_id], capture_output=True, text=True, check=False)
     if result.returncode != 0:
         message = result.stderr.strip() or result.stdout.strip() or "Unable to remove job."
         return False, message
+    invalidate_jobs_cache()
     return True, f"Removed scheduled job {job_id}."
 
 
 @app.route("/", methods=["GET", "POST"])
 def index():
-    spotify_client: Optional[Any] = None
-    devices: list[dict] = []
-    device_error: Optional[str] = None
-    try:
-        spotify_client = build_spotify_client(open_browser=False)
-        devices = fetch_devices(spotify_client)
-    except Exception as exc:  # pragma: no cover - surface auth/network issues
-        device_error = f"Unable to load Spotify devices: {exc}"
-
-    jobs, jobs_error = list_system_jobs(spotify_client=spotify_client)
-
     if request.method == "POST":
         media_input = (request.form.get("media") or "").strip()
         device_name = (request.form.get("device") or "").strip() or None
@@ -413,11 +705,12 @@ def index():
 
         errors = []
         volume_value: Optional[int] = None
+        media_uri: Optional[str] = None
         if not media_input:
             errors.append("Media is required.")
         else:
             try:
-                parse_media_reference(media_input)
+                _, media_uri = parse_media_reference(media_input)
             except ValueError as exc:
                 errors.append(str(exc))
 
@@ -432,6 +725,10 @@ def index():
                 else:
                     errors.append("Volume must be between 0 and 100.")
 
+        if not iso_at and not time_input:
+            errors.append("Provide either an ISO timestamp or both date and time.")
+
+        # Only resolve the schedule once everything else is valid.
         target: Optional[datetime] = None
         if not errors:
             try:
@@ -443,50 +740,152 @@ def index():
             except ValueError as exc:
                 errors.append(str(exc))
 
-        if not iso_at and not time_input:
-            errors.append("Provide either an ISO timestamp or both date and time.")
-
         if errors:
             for item in errors:
                 flash(item, "error")
         elif target is not None:
-            args = SimpleNamespace(media=media_input, device=device_name, volume=volume_value)
+            args = SimpleNamespace(media=media_uri, device=device_name, volume=volume_value)
+            try:
+                spotify_client = get_spotify_client()
+            except Exception:  # pragma: no cover - scheduling builds its own client
+                spotify_client = None
             try:
-                job_label = schedule_system_job(target, args)
+                job_label = schedule_system_job(target, args, spotify_client)
             except Exception as exc:
                 flash(str(exc), "error")
             else:
+                invalidate_jobs_cache()
                 flash(
                     f"Created {job_label} for {target.isoformat(sep=' ', timespec='seconds')}.",
                     "success",
                 )
                 return redirect(url_for("index"))
 
-    devices_ns = [SimpleNamespace(**item) for item in devices]
-    jobs_ns = [SimpleNamespace(**item) for item in jobs]
+    # Devices are only needed to render the form, so successful submissions never
+    # reach the Spotify API.
+    spotify_client: Optional[Any] = None
+    devices: list[dict] = []
+    device_error: Optional[str] = None
+    playback_future: Optional[Future] = None
+    try:
+        spotify_client = get_spotify_client()
+        # The default volume needs its own Spotify call; overlap it with the device lookup.
+        playback_future = _job_pool.submit(_cached_current_playback, spotify_client)
+        devices = fetch_devices(spotify_client, refresh=request.args.get("refresh") == "1")
+    except Exception as exc:  # pragma: no cover - surface auth/network issues
+        device_error = f"Unable to load Spotify devices: {exc}"
 
     # Get next minute rounded time for default
     next_minute = (datetime.now() + timedelta(minutes=1)).replace(second=0, microsecond=0)
 
-    return render_template(
+    # A reload with nothing new to show (same devices, same default minute, no flashed
+    # messages) is answered with 304 before waiting on playback or rendering.
+    etag: Optional[str] = None
+    if request.method == "GET" and device_error is None and not session.get("_flashes"):
+        etag = _index_etag(devices, next_minute)
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+
+    volume: Optional[int] = None
+    if playback_future is not None:
+        try:
+            playback = playback_future.result()
+        except Exception:  # pragma: no cover - the form works without a default
+            playback = None
+        if playback:
+            volume = (playback.get("device") or {}).get("volume_percent")
+
+    response = app.make_response(render_template(
         "index.html",
-        devices=devices_ns,
+        devices=devices,
+        device_options=_render_device_options(devices),
+        active_device=next((item for item in devices if item.get("is_active")), None),
         device_error=device_error,
-        jobs=jobs_ns,
-        jobs_error=jobs_error,
         date=datetime.now().date().isoformat(),
         time=next_minute.time().isoformat(),
-        volume=spotify_client.current_playback().get("device", {}).get("volume_percent") if spotify_client and spotify_client.current_playback() else None,
+        volume=volume,
+    ))
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+        response.cache_control.no_cache = True
+    return response
+
+
+def _index_etag(devices: list[dict], next_minute: datetime) -> str:
+    state = [next_minute.isoformat()]
+    for device in devices:
+        state.append(
+            f"{device.get('id')}|{device.get('name')}|{device.get('is_active')}"
+            f"|{device.get('volume_percent')}"
+        )
+    return hashlib.blake2b("\n".join(state).encode(), digest_size=8).hexdigest()
+
+
+@app.get("/jobs/stream")
+def stream_jobs() -> Response:
+    """Stream the scheduled-job sidebar rows as server-sent events.
+
+    The index page renders without jobs and fills the sidebar from this stream, so
+    the `at` inspection and Spotify lookups no longer delay the first paint.
+    """
+    try:
+        spotify_client = get_spotify_client()
+    except Exception:  # pragma: no cover - jobs still list without metadata
+        spotify_client = None
+
+    def generate():
+        jobs, jobs_error = list_system_jobs(spotify_client=spotify_client)
+        if jobs_error:
+            yield _sse_event("jobs-error", jobs_error)
+        for job in jobs:
+            yield _sse_event("job", render_template("partials/sidebar_job.html", job=job))
+        yield _sse_event("done", "")
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
     )
 
 
+def _sse_event(event: str, data: str) -> str:
+    lines = "".join(f"data: {line}\n" for line in data.splitlines() or [""])
+    return f"event: {event}\n{lines}\n"
+
+
 @app.post("/jobs/remove")
 def remove_job() -> Any:
     success, message = remove_system_job(request.form.get("job_id"))
     flash(message, "success" if success else "error")
-    return redirect(url_for("index"))
+    if request.headers.get("X-Requested-With") != "fetch":
+        return redirect(url_for("index"))
+
+    # Script-driven removals get the refreshed sidebar back in this response instead
+    # of a redirect and a full page render.
+    try:
+        spotify_client = get_spotify_client()
+    except Exception:  # pragma: no cover - jobs still list without metadata
+        spotify_client = None
+    jobs, jobs_error = list_system_jobs(spotify_client=spotify_client)
+    return render_template("partials/job_list.html", jobs=jobs, jobs_error=jobs_error)
+
+
+def create_app() -> Flask:
+    """Return the app with the Spotify client and device cache already warm.
+
+    Load ``web_app:create_app()`` without preloading: the factory then runs inside each
+    worker after the fork, so the warm-up request's connection belongs to that worker
+    alone and its first page load does not wait on Spotify.
+    """
+    try:
+        fetch_devices()
+    except Exception:  # pragma: no cover - surfaced again on the first page load
+        pass
+    return app
 
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", "5000"))
-    app.run(host="0.0.0.0", port=port, debug=os.environ.get("FLASK_DEBUG") == "1")
+    create_app().run(host="0.0.0.0", port=port, debug=os.environ.get("FLASK_DEBUG") == "1")